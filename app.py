@@ -7,6 +7,7 @@ import joblib
 import pandas as pd
 from io import StringIO
 import csv
+from similarity_index import SimilarityIndex, MAX_K, MAX_BATCH
 
 # ---------- Configuration ----------
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -143,9 +144,10 @@ def get_user_predictions(user_id, limit=200):
 MODEL = None
 LABEL_MAP = None
 FEATURE_COLUMNS = None
+SIMILARITY_INDEX = None
 
 def try_load_model():
-    global MODEL, LABEL_MAP, FEATURE_COLUMNS
+    global MODEL, LABEL_MAP, FEATURE_COLUMNS, SIMILARITY_INDEX
     # look for candidate model files
     candidates = []
     try:
@@ -209,6 +211,17 @@ def try_load_model():
     else:
         print("FEATURES LOAD: feature_columns.json not found (optional).")
 
+    # similarity index (memory-mapped, shared across workers via the OS page cache)
+    try:
+        SIMILARITY_INDEX = SimilarityIndex.load(BASE_DIR)
+        if SIMILARITY_INDEX is not None:
+            print("SIMILARITY LOAD: Loaded index with", len(SIMILARITY_INDEX), "profiles")
+        else:
+            print("SIMILARITY LOAD: similarity index not found (optional). Run training to build it.")
+    except Exception as e:
+        SIMILARITY_INDEX = None
+        print("SIMILARITY LOAD: Failed to load similarity index:", e)
+
     if not model_loaded:
         print("MODEL LOAD: No model loaded. /predict will return fallback message.")
     return
@@ -222,6 +235,60 @@ def is_admin_user(session_user):
     except Exception:
         return False
 
+def label_for(pred):
+    """Map an encoded job-role id to its name using LABEL_MAP (falls back to str)."""
+    predicted_label = str(pred)
+    if LABEL_MAP:
+        try:
+            if isinstance(LABEL_MAP, dict):
+                if pred in LABEL_MAP:
+                    predicted_label = LABEL_MAP[pred]
+                elif str(pred) in LABEL_MAP:
+                    predicted_label = LABEL_MAP[str(pred)]
+                else:
+                    for k, v in LABEL_MAP.items():
+                        if v == pred:
+                            predicted_label = k
+                            break
+            else:
+                predicted_label = str(pred)
+        except Exception:
+            predicted_label = str(pred)
+    return predicted_label
+
+def parse_k(value, default=5):
+    """Parse a neighbour count, clamped to 1..MAX_K. Returns None if invalid."""
+    if value is None or str(value).strip() == "":
+        return default
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        return None
+    try:
+        k = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return max(1, min(k, MAX_K))
+
+def similar_profiles(profiles, k):
+    """k nearest training profiles (with role names) for each input dict."""
+    results = SIMILARITY_INDEX.neighbors(profiles, k)
+    for matches in results:
+        for m in matches:
+            m["role"] = label_for(m["role_id"])
+    return results
+
+def with_similar(result, data, k):
+    """Add "similar_profiles" to a /predict response when ?neighbors=k was given."""
+    if k is None:
+        return result
+    result["similar_profiles"] = None
+    if SIMILARITY_INDEX is not None:
+        # optional add-on: never fail the prediction because of it
+        try:
+            result["similar_profiles"] = similar_profiles([data], k)[0]
+        except Exception as e:
+            print("Similar profiles lookup failed:", e)
+    return result
+
 # ---------- Routes ----------
 
 # Home: modal-aware
@@ -321,13 +388,20 @@ def predict():
         user = session.get("user")
         user_id = user["id"] if user else None
 
+        # Optional: "students like you" via /predict?neighbors=5
+        neighbors_k = None
+        if "neighbors" in request.args:
+            neighbors_k = parse_k(request.args.get("neighbors"))
+            if neighbors_k is None:
+                return jsonify({"error": "'neighbors' must be an integer."}), 400
+
         if MODEL is None:
             # Save the attempt with fallback message
             save_prediction(user_id, data, "Model not available (dev).", None)
-            return jsonify({
+            return jsonify(with_similar({
                 "predicted_job_role_id": -1,
                 "predicted_job_role": "Model not available (dev)."
-            }), 200
+            }, data, neighbors_k)), 200
 
         # prepare feature DataFrame if feature list exists
         if FEATURE_COLUMNS and isinstance(FEATURE_COLUMNS, list):
@@ -364,23 +438,7 @@ def predict():
                 return jsonify({"error": f"Model prediction failed: {e}; {e2}"}), 500
 
         pred = preds[0]
-        predicted_label = str(pred)
-        if LABEL_MAP:
-            try:
-                if isinstance(LABEL_MAP, dict):
-                    if pred in LABEL_MAP:
-                        predicted_label = LABEL_MAP[pred]
-                    elif str(pred) in LABEL_MAP:
-                        predicted_label = LABEL_MAP[str(pred)]
-                    else:
-                        for k, v in LABEL_MAP.items():
-                            if v == pred:
-                                predicted_label = k
-                                break
-                else:
-                    predicted_label = str(pred)
-            except Exception:
-                predicted_label = str(pred)
+        predicted_label = label_for(pred)
 
         # Optional: get probability/confidence if model supports it
         confidence = None
@@ -398,15 +456,39 @@ def predict():
         # Save prediction into DB
         save_prediction(user_id, data, predicted_label, confidence)
 
-        return jsonify({
+        return jsonify(with_similar({
             "predicted_job_role_id": int(pred) if isinstance(pred, (int,)) else -1,
             "predicted_job_role": predicted_label,
             "confidence": confidence
-        }), 200
+        }, data, neighbors_k)), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Batch "students like you" lookup
+# POST {"profiles": [{...}, ...], "k": 5} -> {"results": [[{row, distance, role_id, role, profile}, ...], ...]}
+@app.route("/similar", methods=["POST"])
+def similar():
+    if SIMILARITY_INDEX is None:
+        return jsonify({"error": "Similarity index not available. Run training to build it."}), 503
+
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object."}), 400
+    profiles = data.get("profiles")
+    if not isinstance(profiles, list) or not all(isinstance(p, dict) for p in profiles):
+        return jsonify({"error": "'profiles' must be a list of objects."}), 400
+    if len(profiles) > MAX_BATCH:
+        return jsonify({"error": f"At most {MAX_BATCH} profiles per request."}), 400
+    k = parse_k(data.get("k"))
+    if k is None:
+        return jsonify({"error": "'k' must be an integer."}), 400
+
+    try:
+        return jsonify({"k": k, "results": similar_profiles(profiles, k)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # History route
 @app.route("/history")
 def history():
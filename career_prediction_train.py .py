@@ -8,6 +8,7 @@ from sklearn.model_selection import train_test_split
 from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
+from similarity_index import build_index
 
 # ----------------------------------------------------------
 # 1️⃣ Load Dataset
@@ -77,6 +78,13 @@ joblib.dump(label_mapping, "label_mapping.pkl")
 print("✅ Saved label mapping as label_mapping.pkl")
 
 # ----------------------------------------------------------
-# 8️⃣ Done!
+# 8️⃣ Build "students like you" similarity index
+# ----------------------------------------------------------
+# Normalized float32 matrix of the training profiles, memory-mapped by app.py
+shape = build_index(X_train, y_train, ".")
+print("✅ Saved similarity index:", shape)
+
+# ----------------------------------------------------------
+# 9️⃣ Done!
 # ----------------------------------------------------------
 print("\n🚀 Training complete! You can now run app.py to use the model.")
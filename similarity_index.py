@@ -0,0 +1,318 @@
+# ==========================================================
+# "STUDENTS LIKE YOU" - NEAREST-NEIGHBOUR INDEX
+# ==========================================================
+#
+# Built once at training time (see career_prediction_train.py) and loaded by
+# app.py. Each training profile is encoded as a float32 row:
+#   - numeric columns (percentages, ratings, yes/no flags) are z-scored
+#   - nominal columns (LabelEncoder codes with no order, e.g. company type)
+#     are one-hot encoded, so two profiles either match on them or not
+#
+# The arrays live in one joblib file that app.py opens with mmap_mode="r", so
+# every gunicorn worker shares the same pages from the OS cache instead of
+# holding its own copy. The encoding itself is stored in similarity_index.json.
+#
+# Search uses the identity ||q - x||^2 = ||q||^2 - 2 q.x + ||x||^2 with ||x||^2
+# precomputed:
+#   - up to EXACT_MAX_ROWS rows: exact scan of every row
+#   - larger sets: IVF index. Rows are grouped into k-means lists at build
+#     time and a query only scans the lists closest to it (about IVF_SCAN_ROWS
+#     rows in total). This keeps lookups under a millisecond as the data
+#     grows, but results become approximate. Raising nprobe in
+#     similarity_index.json trades latency back for recall.
+
+import os, json, math
+
+import joblib
+import numpy as np
+
+INDEX_DATA_FILE = "similarity_index.joblib"
+INDEX_META_FILE = "similarity_index.json"
+
+# LabelEncoder codes that are categories, not scales (alphabetical order only)
+NOMINAL_COLUMNS = (
+    "certifications",
+    "workshops",
+    "interested career area",
+    "Type of company want to settle in?",
+)
+
+MAX_K = 50
+MAX_BATCH = 100
+# indexes up to this size are scanned exactly; larger ones use IVF lists
+EXACT_MAX_ROWS = 16384
+# rows an IVF query scans (sets the default nprobe)
+IVF_SCAN_ROWS = 8192
+# cap on the (queries x rows) distance block computed at once (~64 MB float32)
+_MAX_BLOCK_CELLS = 1 << 24
+
+
+def _norm_key(name):
+    return str(name).strip().lower()
+
+
+def _finite(v):
+    """float(v) if it is a finite number, else None."""
+    if v is None or isinstance(v, bool) or str(v).strip() == "":
+        return None
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return f if np.isfinite(f) else None
+
+
+# ---------- Build (training time) ----------
+def _fit_encoding(X, nominal):
+    nominal_keys = {_norm_key(c) for c in nominal}
+    encoding, width = [], 0
+    for c in X.columns:
+        col = str(c).strip()
+        values = X[c].to_numpy(dtype=np.float64)
+        if _norm_key(col) in nominal_keys:
+            cats = sorted(set(values.tolist()))
+            encoding.append({"column": col, "type": "onehot", "offset": width, "categories": cats})
+            width += len(cats)
+        else:
+            scale = float(values.std()) or 1.0
+            encoding.append({"column": col, "type": "numeric", "offset": width,
+                             "mean": float(values.mean()), "scale": scale})
+            width += 1
+    return encoding, width
+
+
+def _encode_frame(X, encoding, width):
+    # A one-hot mismatch adds 2 to the squared distance - the same as the
+    # expected squared gap between two random rows on a z-scored column - so
+    # every column carries roughly equal weight.
+    matrix = np.zeros((len(X), width), dtype=np.float32)
+    rows = np.arange(len(X))
+    for c, enc in zip(X.columns, encoding):
+        values = X[c].to_numpy(dtype=np.float64)
+        if enc["type"] == "onehot":
+            pos = np.searchsorted(enc["categories"], values)
+            matrix[rows, enc["offset"] + pos] = 1.0
+        else:
+            matrix[:, enc["offset"]] = (values - enc["mean"]) / enc["scale"]
+    return matrix
+
+
+def _ivf_lists(matrix, nlist):
+    """k-means list id for every row (centroids trained on a sample)."""
+    from sklearn.cluster import KMeans
+
+    rng = np.random.default_rng(42)
+    sample = matrix[rng.choice(len(matrix), min(len(matrix), nlist * 64), replace=False)]
+    km = KMeans(n_clusters=nlist, n_init=1, max_iter=20, random_state=42).fit(sample)
+    centroids = km.cluster_centers_.astype(np.float32)
+    cnorms = np.einsum("ij,ij->i", centroids, centroids)
+
+    assign = np.empty(len(matrix), dtype=np.int64)
+    step = max(1, _MAX_BLOCK_CELLS // nlist)
+    for start in range(0, len(matrix), step):
+        block = matrix[start:start + step]
+        assign[start:start + step] = np.argmin(cnorms - 2.0 * (block @ centroids.T), axis=1)
+    return centroids, assign
+
+
+def build_index(X, y, out_dir=".", nominal=NOMINAL_COLUMNS, nlist=None):
+    """
+    Encode the training features and write the index files to out_dir.
+    X: DataFrame of training features, y: encoded job-role ids (same order).
+    nlist: number of IVF lists; by default 1 (exact scan) up to EXACT_MAX_ROWS
+    rows, else about sqrt(rows).
+    """
+    encoding, width = _fit_encoding(X, nominal)
+    matrix = _encode_frame(X, encoding, width)
+    roles = np.asarray(y, dtype=np.int32).reshape(-1)
+    if roles.shape[0] != matrix.shape[0]:
+        raise ValueError(f"X has {matrix.shape[0]} rows but y has {roles.shape[0]}")
+
+    n = matrix.shape[0]
+    if nlist is None:
+        nlist = 1 if n <= EXACT_MAX_ROWS else min(4096, int(math.sqrt(n)))
+    nlist = max(1, min(int(nlist), n))
+    if nlist == 1:
+        centroids = matrix.mean(axis=0, keepdims=True)
+        assign = np.zeros(n, dtype=np.int64)
+    else:
+        centroids, assign = _ivf_lists(matrix, nlist)
+    nprobe = max(1, min(nlist, math.ceil(IVF_SCAN_ROWS * nlist / n)))
+
+    # store rows grouped by list so each list is one contiguous slice
+    ids = np.argsort(assign, kind="stable")
+    matrix = np.ascontiguousarray(matrix[ids])
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))])
+
+    os.makedirs(out_dir, exist_ok=True)
+    joblib.dump({
+        "matrix": matrix,
+        "norms": np.einsum("ij,ij->i", matrix, matrix).astype(np.float32),
+        "ids": ids.astype(np.int64),
+        "offsets": offsets.astype(np.int64),
+        "centroids": centroids.astype(np.float32),
+        "roles": roles,
+        "profiles": X.to_numpy(dtype=np.float32)
+    }, os.path.join(out_dir, INDEX_DATA_FILE))
+    with open(os.path.join(out_dir, INDEX_META_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "columns": [e["column"] for e in encoding],
+            "encoding": encoding,
+            "width": width,
+            "rows": int(n),
+            "nlist": int(nlist),
+            "nprobe": int(nprobe)
+        }, f, indent=2)
+    return matrix.shape
+
+
+# ---------- Search (serving time) ----------
+class SimilarityIndex:
+    def __init__(self, data, meta):
+        # plain ndarray views of the memmaps: same shared pages, cheaper slicing
+        self.matrix = np.asarray(data["matrix"])
+        self.norms = np.asarray(data["norms"])
+        self.ids = np.asarray(data["ids"])
+        self.offsets = np.asarray(data["offsets"]).tolist()
+        self.centroids = np.asarray(data["centroids"])
+        self.centroid_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        self.roles = np.asarray(data["roles"])
+        self.profiles = np.asarray(data["profiles"])
+        self.columns = list(meta["columns"])
+        self.encoding = meta["encoding"]
+        self.width = int(meta["width"])
+        self.nlist = int(meta["nlist"])
+        self.nprobe = int(meta["nprobe"])
+        self._fields = {}
+        for enc in self.encoding:
+            cats = {float(c): j for j, c in enumerate(enc.get("categories", []))}
+            self._fields[_norm_key(enc["column"])] = (enc, cats)
+
+    @classmethod
+    def load(cls, base_dir):
+        """Memory-map the index from base_dir. Returns None if it has not been built."""
+        data_path = os.path.join(base_dir, INDEX_DATA_FILE)
+        meta_path = os.path.join(base_dir, INDEX_META_FILE)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(joblib.load(data_path, mmap_mode="r"), meta)
+
+    def __len__(self):
+        return int(self.matrix.shape[0])
+
+    def vectorize(self, profiles):
+        """
+        Turn a list of input dicts into encoded query rows. Keys are matched to
+        index columns case/whitespace-insensitively (like /predict). Missing,
+        non-numeric or non-finite values (and unknown categories) are left
+        neutral - the training mean, or no category - so they do not pull the
+        search in any direction.
+        """
+        queries = np.zeros((len(profiles), self.width), dtype=np.float32)
+        for r, data in enumerate(profiles):
+            for k, v in data.items():
+                field = self._fields.get(_norm_key(k))
+                f = _finite(v) if field else None
+                if f is None:
+                    continue
+                enc, cats = field
+                if enc["type"] == "onehot":
+                    if f in cats:
+                        queries[r, enc["offset"] + cats[f]] = 1.0
+                else:
+                    queries[r, enc["offset"]] = (f - enc["mean"]) / enc["scale"]
+        return queries
+
+    def _top_k(self, d2, positions, k):
+        if k < d2.shape[-1]:
+            part = np.argpartition(d2, k - 1, axis=-1)[..., :k]
+        else:
+            part = np.broadcast_to(np.arange(d2.shape[-1]), d2.shape)
+        part_d2 = np.take_along_axis(d2, part, axis=-1)
+        order = np.argsort(part_d2, axis=-1, kind="stable")
+        top = np.take_along_axis(part, order, axis=-1)
+        dist = np.sqrt(np.maximum(np.take_along_axis(part_d2, order, axis=-1), 0.0))
+        return self.ids[positions[top]], dist
+
+    def search(self, queries, k):
+        """
+        k-nearest-neighbour search for encoded query rows. Exact for a single
+        list; with IVF lists only the nprobe lists nearest each query are
+        scanned. Returns (row ids, distances), both (n_queries, k), nearest first.
+        """
+        n = len(self)
+        k = max(1, min(int(k), n))
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.width)
+        out_idx = np.empty((queries.shape[0], k), dtype=np.int64)
+        out_dist = np.empty((queries.shape[0], k), dtype=np.float32)
+        qnorms = np.einsum("ij,ij->i", queries, queries)
+
+        if self.nlist == 1:
+            positions = np.arange(n)
+            step = max(1, _MAX_BLOCK_CELLS // n)
+            for start in range(0, queries.shape[0], step):
+                q = queries[start:start + step]
+                d2 = q @ self.matrix.T
+                d2 *= -2.0
+                d2 += self.norms
+                d2 += qnorms[start:start + step, None]
+                out_idx[start:start + step], out_dist[start:start + step] = \
+                    self._top_k(d2, positions, k)
+            return out_idx, out_dist
+
+        nprobe = min(self.nprobe, self.nlist)
+        for i, q in enumerate(queries):
+            cd = self.centroid_norms - 2.0 * (self.centroids @ q)
+            # nearest lists first; keep going past nprobe only until k rows are in
+            slices, count = [], 0
+            for l in np.argsort(cd).tolist():
+                lo, hi = self.offsets[l], self.offsets[l + 1]
+                if hi > lo:
+                    slices.append((lo, hi))
+                    count += hi - lo
+                if len(slices) >= nprobe and count >= k:
+                    break
+            d2 = np.concatenate([self.norms[lo:hi] - 2.0 * (self.matrix[lo:hi] @ q) for lo, hi in slices])
+            d2 += qnorms[i]
+            positions = np.concatenate([np.arange(lo, hi) for lo, hi in slices])
+            out_idx[i], out_dist[i] = self._top_k(d2, positions, k)
+        return out_idx, out_dist
+
+    def profile(self, row):
+        """Original feature values of a training row."""
+        return {c: float(v) for c, v in zip(self.columns, self.profiles[row])}
+
+    def neighbors(self, profiles, k):
+        """k nearest training profiles for each input dict, as plain dicts."""
+        idx, dist = self.search(self.vectorize(profiles), k)
+        results = []
+        for rows, dists in zip(idx, dist):
+            results.append([{
+                "row": int(r),
+                "distance": round(float(d), 4),
+                "role_id": int(self.roles[r]),
+                "profile": self.profile(r)
+            } for r, d in zip(rows, dists)])
+        return results
+
+
+# Rebuild the index from the exported split without retraining:
+#     python similarity_index.py
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+
+    base = os.path.abspath(os.path.dirname(__file__))
+    X_train = pd.read_csv(os.path.join(base, "X_train.csv"))
+    y_train = pd.read_csv(os.path.join(base, "y_train.csv")).iloc[:, 0]
+    shape = build_index(X_train, y_train, base)
+    print("✅ Saved similarity index:", shape)
+
+    index = SimilarityIndex.load(base)
+    sample = X_train.sample(200, random_state=42).to_dict("records")
+    start = time.perf_counter()
+    for p in sample:
+        index.neighbors([p], 5)
+    print("Mean lookup (k=5): %.3f ms" % ((time.perf_counter() - start) / len(sample) * 1e3))
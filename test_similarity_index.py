@@ -0,0 +1,220 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from similarity_index import build_index, SimilarityIndex
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def _synthetic(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "Percentage in Mathematics": rng.integers(60, 95, n),
+        "coding skills rating": rng.integers(1, 10, n),
+        "worked in teams ever?": rng.integers(0, 2, n),
+        "Type of company want to settle in?": rng.integers(0, 10, n),
+    })
+    y = rng.integers(0, 12, n)
+    return X, y
+
+
+def _true_distances(index, queries):
+    """float64 distance from every query to every training row (by row id)."""
+    matrix = np.zeros((len(index), index.width))
+    matrix[index.ids] = np.asarray(index.matrix, dtype=np.float64)
+    return np.sqrt(((queries.astype(np.float64)[:, None, :] - matrix[None, :, :]) ** 2).sum(axis=-1))
+
+
+def _queries(index, X):
+    rng = np.random.default_rng(1)
+    queries = index.vectorize(X.sample(20, random_state=1).to_dict("records"))
+    return queries + rng.normal(0, 0.1, queries.shape).astype(np.float32)
+
+
+def _assert_valid_result(idx, dist, true_dist, k):
+    assert idx.shape == dist.shape == (len(true_dist), k)
+    for rows, d, truth in zip(idx, dist, true_dist):
+        assert len(set(rows.tolist())) == k
+        assert np.all(np.diff(d) >= 0)
+        # every returned row really sits at the returned distance
+        np.testing.assert_allclose(d, truth[rows], rtol=1e-4, atol=1e-3)
+
+
+@pytest.mark.parametrize("nlist", [1, 8])
+@pytest.mark.parametrize("k", [1, 5, 300, 1000])
+def test_search_matches_brute_force(tmp_path, nlist, k):
+    X, y = _synthetic()
+    build_index(X, y, tmp_path, nlist=nlist)
+    index = SimilarityIndex.load(tmp_path)
+    index.nprobe = index.nlist  # probing every list must be exact
+    queries = _queries(index, X)
+
+    idx, dist = index.search(queries, k)
+    true_dist = _true_distances(index, queries)
+    k = min(k, len(X))
+    _assert_valid_result(idx, dist, true_dist, k)
+    # same distances as the true k nearest: with the check above, the rows
+    # are a correct k-NN set (ties at the k-th distance may pick either row)
+    np.testing.assert_allclose(dist, np.sort(true_dist, axis=1)[:, :k], rtol=1e-4, atol=1e-3)
+
+
+@pytest.mark.parametrize("k", [5, 50, 200, 300])
+def test_ivf_probe_returns_k_unique_rows(tmp_path, k):
+    X, y = _synthetic()
+    build_index(X, y, tmp_path, nlist=8)
+    index = SimilarityIndex.load(tmp_path)
+    index.nprobe = 1
+    queries = _queries(index, X)
+
+    idx, dist = index.search(queries, k)
+    _assert_valid_result(idx, dist, _true_distances(index, queries), k)
+
+
+def test_empty_batch(tmp_path):
+    X, y = _synthetic()
+    build_index(X, y, tmp_path)
+    index = SimilarityIndex.load(tmp_path)
+    idx, dist = index.search(index.vectorize([]), 5)
+    assert idx.shape == (0, 5) and dist.shape == (0, 5)
+    assert index.neighbors([], 5) == []
+
+
+def test_nominal_columns_are_one_hot(tmp_path):
+    X, y = _synthetic()
+    build_index(X, y, tmp_path)
+    index = SimilarityIndex.load(tmp_path)
+    base = {"Percentage in Mathematics": 80, "coding skills rating": 5, "worked in teams ever?": 1}
+    q0, q1, q9 = index.vectorize([dict(base, **{"Type of company want to settle in?": c}) for c in (0, 1, 9)])
+    assert np.linalg.norm(q0 - q1) == pytest.approx(np.linalg.norm(q0 - q9))
+
+
+def test_non_finite_values_fall_back_to_neutral(tmp_path):
+    X, y = _synthetic()
+    build_index(X, y, tmp_path)
+    index = SimilarityIndex.load(tmp_path)
+    bad = index.vectorize([{"Percentage in Mathematics": v, "coding skills rating": "inf"}
+                           for v in (float("nan"), "nan", "-inf", None, "abc")])
+    np.testing.assert_array_equal(bad, index.vectorize([{}] * 5))
+    for matches in index.neighbors([{"Percentage in Mathematics": float("nan")}], 3):
+        assert all(np.isfinite(m["distance"]) for m in matches)
+
+
+def test_profile_round_trips_training_rows(tmp_path):
+    X = pd.read_csv(os.path.join(BASE_DIR, "X_train.csv"))
+    y = pd.read_csv(os.path.join(BASE_DIR, "y_train.csv")).iloc[:, 0]
+    build_index(X, y, tmp_path)
+    index = SimilarityIndex.load(tmp_path)
+    X.columns = X.columns.str.strip()
+    for row in (0, 1, len(X) // 2, len(X) - 1):
+        assert index.profile(row) == {c: float(v) for c, v in X.iloc[row].items()}
+        assert int(index.roles[row]) == int(y.iloc[row])
+        # a training row is its own nearest neighbour (float32 rounding aside)
+        match = index.neighbors([X.iloc[row].to_dict()], 1)[0][0]
+        assert match["distance"] == pytest.approx(0.0, abs=1e-2)
+        assert match["profile"] == index.profile(row)
+
+
+# ---------- HTTP: /similar and /predict?neighbors=k ----------
+class _FixedModel:
+    def predict(self, X):
+        return [3]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import app
+
+    X, y = _synthetic()
+    build_index(X, y, tmp_path / "index")
+    monkeypatch.setattr(app, "DB_PATH", str(tmp_path / "users.db"))
+    app.init_db()
+    monkeypatch.setattr(app, "SIMILARITY_INDEX", SimilarityIndex.load(tmp_path / "index"))
+    monkeypatch.setattr(app, "LABEL_MAP", {i: f"Role {i}" for i in range(12)})
+    monkeypatch.setattr(app, "MODEL", None)
+    monkeypatch.setattr(app, "FEATURE_COLUMNS", None)
+    return app.app.test_client()
+
+
+PROFILE = {"Percentage in Mathematics": 80, "coding skills rating": 5,
+           "Type of company want to settle in?": 3}
+
+
+def _assert_named_matches(matches, k):
+    assert len(matches) == k
+    for m in matches:
+        assert m["role"] == f"Role {m['role_id']}"
+        assert set(m) == {"row", "distance", "role_id", "role", "profile"}
+
+
+def test_similar_returns_named_neighbours(client):
+    res = client.post("/similar", json={"profiles": [PROFILE, {}], "k": 3})
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["k"] == 3 and len(body["results"]) == 2
+    for matches in body["results"]:
+        _assert_named_matches(matches, 3)
+
+
+def test_similar_without_index(client, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, "SIMILARITY_INDEX", None)
+    assert client.post("/similar", json={"profiles": [PROFILE]}).status_code == 503
+
+
+@pytest.mark.parametrize("body", [
+    '{"profiles": [{}], "k": "x"}',
+    '{"profiles": [{}], "k": 2.7}',
+    '{"profiles": [{}], "k": true}',
+    '{"profiles": [{}], "k": 1e400}',
+    '{"profiles": [{}], "k": Infinity}',
+    '{"profiles": {}}',
+    '[1, 2]',
+])
+def test_similar_rejects_bad_requests(client, body):
+    res = client.post("/similar", data=body, content_type="application/json")
+    assert res.status_code == 400
+    assert "error" in res.get_json()
+
+
+def test_similar_rejects_large_batch(client):
+    from similarity_index import MAX_BATCH
+
+    res = client.post("/similar", json={"profiles": [PROFILE] * (MAX_BATCH + 1)})
+    assert res.status_code == 400
+
+
+@pytest.mark.parametrize("model", [None, _FixedModel()])
+def test_predict_with_neighbors(client, monkeypatch, model):
+    import app
+
+    monkeypatch.setattr(app, "MODEL", model)
+    res = client.post("/predict?neighbors=4", json=PROFILE)
+    assert res.status_code == 200
+    body = res.get_json()
+    _assert_named_matches(body["similar_profiles"], 4)
+    if model is not None:
+        assert body["predicted_job_role"] == "Role 3"
+
+    assert "similar_profiles" not in client.post("/predict", json=PROFILE).get_json()
+
+
+def test_predict_rejects_bad_neighbors(client):
+    assert client.post("/predict?neighbors=abc", json=PROFILE).status_code == 400
+
+
+def test_predict_survives_neighbour_failure(client, monkeypatch):
+    import app
+
+    def boom(profiles, k):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(app.SIMILARITY_INDEX, "neighbors", boom)
+    monkeypatch.setattr(app, "MODEL", _FixedModel())
+    res = client.post("/predict?neighbors=4", json=PROFILE)
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["predicted_job_role"] == "Role 3" and body["similar_profiles"] is None